@@ -2,10 +2,38 @@
 import networkx as nx
 import matplotlib.pyplot as plt
 import random
+import sys
 import itertools
 import math
+import pickle
+import queue
+import multiprocessing as mp
+from functools import reduce
+from operator import xor
+import numpy as np
 from matplotlib.patches import FancyArrowPatch
 
+# numba is optional, SG falls back to pure python without it
+try:
+    from numba import njit, types
+    from numba.typed import Dict
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    try:
+        # private numba module (cttz intrinsic), may move between releases
+        from numba.cpython.unsafe.numbers import trailing_zeros
+    except ImportError:
+        @njit(cache=True)
+        def trailing_zeros(x):
+            """index of the lowest set bit of x (x != 0), plain bit scan"""
+            i = 0
+            while not (x >> i) & 1:
+                i += 1
+            return i
+
 # graph gen
 
 def gen_graph(min_n=5, max_n=12, max_deg=3):
@@ -61,64 +89,60 @@ def _rand_spread(g, w=10.0, h=8.0, min_d=0.9, reps=250, pull=0.06):
     min_d: desired min distance between nodes
     reps: number of repulsion iterations
     pull: tiny attraction along edges to keep neighbors close
+    result is cached in g.graph["_layout"] until nodes/edges/params change.
+    not for frozen graphs (subgraph views share .graph with their parent)
     """
     n = len(g)
     if n == 0:
         return {}
 
+    cache = not nx.is_frozen(g)
+    key = (tuple(g.nodes()), tuple(g.edges()), w, h, min_d, reps, pull)
+    cached = g.graph.get("_layout") if cache else None
+    if cached is not None and cached[0] == key:
+        return dict(cached[1])
+
     # start from stored pos if present, else uniform random
     old = nx.get_node_attributes(g, "pos")
-    pos = {}
-    for i, nd in enumerate(g.nodes()):
+    nodes = list(g.nodes())
+    P = np.empty((n, 2))
+    for i, nd in enumerate(nodes):
         if nd in old:
             x, y = old[nd]
             # scale stored pos into box roughly
-            pos[nd] = ( (x % 1.0) * w, (y % 1.0) * h )
+            P[i] = ((x % 1.0) * w, (y % 1.0) * h)
         else:
-            pos[nd] = (random.random() * w, random.random() * h)
-
-    # crude repulsion iterations
-    nodes = list(g.nodes())
+            P[i] = (random.random() * w, random.random() * h)
+
+    # edge pull on every edge at once is L @ P, L = adjacency - degree
+    idx = {nd: i for i, nd in enumerate(nodes)}
+    L = np.zeros((n, n))
+    for a, b in g.edges():
+        L[idx[a], idx[b]] += 1.0
+        L[idx[b], idx[a]] += 1.0
+    L -= np.diag(L.sum(axis=1))
+    off = ~np.eye(n, dtype=bool)
+    # seeded from random so random.seed still gives repeatable layouts
+    rng = np.random.default_rng(random.getrandbits(32))
+
+    # crude repulsion iterations, all pairs at once
     for it in range(reps):
         # small random jitter so system doesn't lock into bad sym
-        for nd in nodes:
-            jx = (random.random() - 0.5) * 0.01
-            jy = (random.random() - 0.5) * 0.01
-            x, y = pos[nd]
-            pos[nd] = (x + jx, y + jy)
-
-        # repel pairs that are too close
-        for i in range(n):
-            u = nodes[i]
-            ux, uy = pos[u]
-            for j in range(i+1, n):
-                v = nodes[j]
-                vx, vy = pos[v]
-                dx = ux - vx
-                dy = uy - vy
-                dist = math.hypot(dx, dy) + 1e-6
-                if dist < min_d:
-                    # push them apart a bit (crude)
-                    need = (min_d - dist) * 0.5
-                    nx_u = ux + (dx/dist) * need
-                    ny_u = uy + (dy/dist) * need
-                    nx_v = vx - (dx/dist) * need
-                    ny_v = vy - (dy/dist) * need
-                    pos[u] = (nx_u, ny_u)
-                    pos[v] = (nx_v, ny_v)
-                    ux, uy = pos[u]  # update for next pairs
+        P += (rng.random((n, 2)) - 0.5) * 0.01
+
+        # repel pairs that are too close: D[i, j] = P[i] - P[j]
+        D = P[:, None, :] - P[None, :, :]
+        dist = np.hypot(D[..., 0], D[..., 1]) + 1e-6
+        need = np.where((dist < min_d) & off, (min_d - dist) * 0.5 / dist, 0.0)
+        P += (D * need[..., None]).sum(axis=1)
 
         # pull neighbors slightly together so edges look short
-        for (a, b) in g.edges():
-            ax, ay = pos[a]
-            bx, by = pos[b]
-            dx = bx - ax
-            dy = by - ay
-            # move each a bit towards the other
-            pos[a] = (ax + dx * pull, ay + dy * pull)
-            pos[b] = (bx - dx * pull, by - dy * pull)
+        P += pull * (L @ P)
 
-    return pos
+    pos = {nd: (float(P[i, 0]), float(P[i, 1])) for i, nd in enumerate(nodes)}
+    if cache:
+        g.graph["_layout"] = (key, pos)
+    return dict(pos)
 
 
 def draw(g, title="graph"):
@@ -143,17 +167,12 @@ def draw(g, title="graph"):
     plt.show()
 
 
-def draw_with_pos(g, title="graph"):
-    """
-    same as draw (kept for compatibility)
-    """
-    fig, ax = plt.subplots(figsize=(9,7))
+def _draw_on(ax, g, title):
+    """draw g on ax the way draw_with_pos does (ax is cleared first)"""
     ax.clear()
-
     if len(g.nodes()) == 0:
         ax.text(0.5, 0.5, "empty graph", ha='center', va='center')
         ax.set_title(title)
-        plt.show()
         return
 
     pos = _rand_spread(g, w=10.0, h=8.0, min_d=0.9, reps=250, pull=0.05)
@@ -165,8 +184,90 @@ def draw_with_pos(g, title="graph"):
 
     ax.set_title(title)
     ax.set_axis_off()
-    plt.tight_layout()
+
+
+def draw_with_pos(g, title="graph", ax=None):
+    """
+    same as draw (kept for compatibility)
+    ax: redraw into this axes and update its window without blocking,
+    instead of opening (and waiting on) a new figure. lets a game reuse one
+    figure for all its turns. returns the axes drawn on (a new one if the
+    window of ax was closed), pass it in again next time
+    """
+    if ax is not None:
+        if not plt.fignum_exists(ax.figure.number):
+            fig, ax = plt.subplots(figsize=(9,7))
+        _draw_on(ax, g, title)
+        fig = ax.figure
+        if len(g.nodes()) > 0:
+            fig.tight_layout()
+        fig.canvas.draw_idle()
+        plt.pause(0.001)
+        return ax
+    fig, ax = plt.subplots(figsize=(9,7))
+    _draw_on(ax, g, title)
+    if len(g.nodes()) > 0:
+        plt.tight_layout()
     plt.show()
+
+
+def _render_loop(q):
+    """
+    body of the Renderer process: draws (nodes, edges, title) jobs from q
+    into one window until it gets None. the window opens with the first job.
+    nodes are (node, attrs) pairs, so the stored 'pos' seeds the layout
+    """
+    plt.ion()
+    ax = None
+    while True:
+        if ax is None or not plt.fignum_exists(ax.figure.number):
+            # no window to keep alive, just wait
+            job = q.get()
+        else:
+            try:
+                job = q.get_nowait()
+            except queue.Empty:
+                # let the gui handle its events while idle. not plt.pause,
+                # which would raise the window over the terminal every time
+                ax.figure.canvas.start_event_loop(0.05)
+                continue
+        if job is None:
+            break
+        nodes, edges, title = job
+        g = nx.Graph()
+        g.add_nodes_from(nodes)
+        g.add_edges_from(edges)
+        if ax is None:
+            ax = plt.subplots(figsize=(9,7))[1]
+        ax = draw_with_pos(g, title, ax=ax)
+    plt.close("all")
+
+
+class Renderer:
+    """
+    draws graphs in a background process so play() doesn't wait on
+    matplotlib (layout + drawing) before analysing the next turn.
+    draw_with_pos has the same signature as the function, it only queues
+    the node (with attributes) and edge lists. call close() when done
+    """
+    def __init__(self):
+        # spawn, so the child starts with its own clean gui state
+        ctx = mp.get_context("spawn")
+        self.q = ctx.Queue()
+        self.proc = ctx.Process(target=_render_loop, args=(self.q,),
+                                daemon=True)
+        self.proc.start()
+
+    def draw_with_pos(self, g, title="graph"):
+        # node attributes too: _rand_spread starts from the stored 'pos'
+        self.q.put((list(g.nodes(data=True)), list(g.edges()), title))
+
+    def close(self):
+        self.q.put(None)
+        self.proc.join(timeout=5)
+        if self.proc.is_alive():
+            self.proc.terminate()
+
 # game mechanics
 
 def remove_node_and_neighbors(g, node, verbose=True):
@@ -177,120 +278,530 @@ def remove_node_and_neighbors(g, node, verbose=True):
         if verbose:
             print("no such node")
         return False
-    nb = list(g.neighbors(node))
-    g.remove_node(node)
+    nb = [n for n in g.neighbors(node) if n != node]
+    g.remove_nodes_from([node] + nb)
     if verbose:
         print("removed", node)
-    for n in nb:
-        if n in g.nodes():
-            g.remove_node(n)
-            if verbose:
-                print(" also removed", n)
+        for n in nb:
+            print(" also removed", n)
     return True
 
 # sprague-grundy analyzer (naive recursive + memo + XOR optimization)
+# _shape_memo: component shape (see SG._canon) -> grundy, shared by all SG
+# instances. per-state memos stay on each analyzer, so a game's state table
+# is freed with its analyzer (a 50-node game can reach millions of states)
+_shape_memo = {}
+
+# biggest random graph play_rand will generate. worst of 6 gen_graph samples
+# per max degree 2-8, initial grundy_and_winning: numba 0.55s at 40 nodes
+# (1.1s at 42, 1.7s at 45), python 0.3s at 30 (0.9s at 32, 2s at 34).
+# degree 3-4 is the slowest, sparser or denser graphs are much faster
+MAX_ANALYZABLE = 40 if NUMBA_AVAILABLE else 30
+
+def clear_grundy_cache():
+    """forget grundy results shared between SG instances"""
+    _shape_memo.clear()
+
 def mex(s):
     i = 0
     while i in s:
         i += 1
     return i
 
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _component(state, adj):
+        """bitmask of the component of state holding its lowest node"""
+        n = adj.shape[0]
+        comp = state & -state
+        frontier = comp
+        while frontier:
+            nb = 0
+            for i in range(n):
+                if (frontier >> i) & 1:
+                    nb |= adj[i]
+            frontier = nb & state & ~comp
+            comp |= frontier
+        return comp
+
+    @njit(cache=True)
+    def _grundy_kernel(state, adj, closed, memo):
+        """
+        grundy value of int64 bitmask state (numba version of SG.grundy)
+        adj, closed: int64 arrays of neighbor / closed-neighborhood masks
+        memo: typed dict state -> grundy, shared between calls
+        iterative dfs, one frame per depth (depth <= number of nodes).
+        a split frame XORs its components, a move frame takes the mex
+        """
+        if state in memo:
+            return memo[state]
+        n = closed.shape[0]
+        st = np.zeros(n + 1, np.int64)     # state of each frame
+        split = np.zeros(n + 1, np.bool_)  # frame is a disconnected state
+        nxt = np.zeros(n + 1, np.int64)    # split: nodes left, else next index
+        acc = np.zeros(n + 1, np.int64)    # split: xor so far, else seen bits
+        d = 0
+        st[0] = state
+        split[0] = _component(state, adj) != state
+        nxt[0] = state if split[0] else 0
+        while True:
+            cur = st[d]
+            child = 0
+            done = False
+            if split[d]:
+                r = nxt[d]
+                if r == 0:
+                    g = acc[d]
+                    done = True
+                else:
+                    child = _component(r, adj)
+                    nxt[d] = r & ~child
+            else:
+                i = nxt[d]
+                while i < n and not (cur >> i) & 1:
+                    i += 1
+                if i == n:
+                    # all moves tried: mex of seen = index of its lowest
+                    # zero bit (seen < 2**62, at most one bit per node)
+                    s = acc[d]
+                    g = trailing_zeros(~s & (s + 1))
+                    done = True
+                else:
+                    nxt[d] = i + 1
+                    child = cur & ~closed[i]
+
+            if done:
+                memo[cur] = g
+                if d == 0:
+                    return g
+                d -= 1
+                if split[d]:
+                    acc[d] ^= g
+                else:
+                    acc[d] |= 1 << g
+            elif child in memo:
+                if split[d]:
+                    acc[d] ^= memo[child]
+                else:
+                    acc[d] |= 1 << memo[child]
+            else:
+                d += 1
+                st[d] = child
+                # a component of a split frame is connected already
+                split[d] = (not split[d - 1]
+                            and _component(child, adj) != child)
+                nxt[d] = child if split[d] else 0
+                acc[d] = 0
+
 class SG:
     """
     simple sprague-grundy analyzer with XOR optimization
+    states are int bitmasks: bit i set means self.nodes[i] is still present
     use SG(g).grundy() or .winning_moves()
+    use_numba: solve with _grundy_kernel when numba is installed and the
+    graph has at most 62 nodes (states and grundy bits fit an int64)
     """
-    def __init__(self, g, use_xor=True):
-        self.g = g.copy()
+    def __init__(self, g, use_xor=True, use_numba=True):
+        # no copy: g is only read here, later changes to g don't affect
+        # the analyzer (everything it needs is in nodes/adj/closed)
+        self.g = g
         self.nodes = tuple(sorted(self.g.nodes()))
-        self.edges = set(self.g.edges())
-        self.memo = {}
+        self.idx = idx = {nd: i for i, nd in enumerate(self.nodes)}
+        n = len(self.nodes)
+        # adj[i]: bitmask of neighbors of node i, closed[i]: adj[i] plus i
+        self.adj = [0] * n
+        for u, v in self.g.edges():
+            self.adj[idx[u]] |= 1 << idx[v]
+            self.adj[idx[v]] |= 1 << idx[u]
+        self.closed = [self.adj[i] | (1 << i) for i in range(n)]
+        self.full = (1 << n) - 1
+        self.use_numba = use_numba and NUMBA_AVAILABLE and n <= 62
+        if self.use_numba:
+            self.nb_adj = np.array(self.adj, dtype=np.int64)
+            self.nb_closed = np.array(self.closed, dtype=np.int64)
+            self.nb_memo = Dict.empty(types.int64, types.int64)
+            self.nb_memo[0] = 0
+        # state -> grundy, kept for the analyzer's lifetime (e.g. one game)
+        self.memo = {0: 0}
+        # connected components keyed by shape (see _canon), so the same
+        # subgame under different node ids is only solved once
+        self.comp_memo = _shape_memo
         self.use_xor = use_xor
+        # states known to be N-positions, grundy not computed (see _is_p)
+        self.n_states = set()
         # stats for analysis
         self.xor_hits = 0
         self.recursive_calls = 0
 
-    def _nbrs(self, node, rem):
-        out = []
-        for n in rem:
-            if n != node and ((node,n) in self.edges or (n,node) in self.edges):
-                out.append(n)
-        return out
-
     def _find_components(self, state):
-        """find connected components in subgraph induced by state"""
-        rem = set(state)
-        visited = set()
+        """find connected components (as bitmasks) of the subgraph induced by state"""
         comps = []
-        
-        for node in state:
-            if node in visited:
-                continue
-            # bfs to find component
-            comp = set()
-            queue = [node]
-            while queue:
-                curr = queue.pop(0)
-                if curr in visited:
-                    continue
-                visited.add(curr)
-                comp.add(curr)
-                # add neighbors that are still in state
-                for nb in self._nbrs(curr, rem):
-                    if nb not in visited:
-                        queue.append(nb)
-            comps.append(frozenset(comp))
-        
+        s = state
+        while s:
+            # grow component of lowest remaining node one bfs layer at a time
+            comp = frontier = s & -s
+            while frontier:
+                nxt = 0
+                f = frontier
+                while f:
+                    k = (f & -f).bit_length() - 1
+                    f &= f - 1
+                    nxt |= self.adj[k]
+                frontier = nxt & s & ~comp
+                comp |= frontier
+            comps.append(comp)
+            s &= ~comp
         return comps
 
+    def _canon(self, comp):
+        """
+        shape key for a connected component: relabel its nodes 0..k-1 in bfs
+        order and list the relabelled neighbor masks. equal keys mean
+        isomorphic components (not always the other way round)
+        the bfs starts at a min-degree node and visits neighbors by degree,
+        so isomorphic copies with different node ids usually get the same key
+        """
+        deg = {}
+        f = comp
+        while f:
+            b = (f & -f).bit_length() - 1
+            f &= f - 1
+            deg[b] = bin(self.adj[b] & comp).count("1")
+        start = min(deg, key=deg.get)
+        order = [start]
+        lab = {start: 0}
+        j = 0
+        while j < len(order):
+            f = self.adj[order[j]] & comp
+            nbs = []
+            while f:
+                b = (f & -f).bit_length() - 1
+                f &= f - 1
+                if b not in lab:
+                    nbs.append((deg[b], b))
+            for _, b in sorted(nbs):
+                lab[b] = len(order)
+                order.append(b)
+            j += 1
+        key = []
+        for nd in order:
+            m = 0
+            f = self.adj[nd] & comp
+            while f:
+                b = (f & -f).bit_length() - 1
+                f &= f - 1
+                m |= 1 << lab[b]
+            key.append(m)
+        return tuple(key)
+
     def _next_states(self, state):
+        """
+        distinct child states. nodes with the same closed neighborhood
+        inside state (leaves of a star, twins) give the same child, so only
+        one of them is kept
+        """
         out = []
-        rem = set(state)
-        for node in state:
-            nb = set(self._nbrs(node, rem))
-            new = rem - {node} - nb
-            out.append(frozenset(new))
+        done = set()
+        s = state
+        while s:
+            i = (s & -s).bit_length() - 1
+            s &= s - 1
+            child = state & ~self.closed[i]
+            if child not in done:
+                done.add(child)
+                out.append(child)
         return out
 
+    def _grundy_numba(self, state):
+        """
+        grundy of state with _grundy_kernel. with use_xor, each connected
+        component of state is first looked up in the shared shape memo, and
+        only unknown shapes go to the kernel (their value is stored there
+        after), so isomorphic components are solved once across analyzers
+        """
+        if state in self.nb_memo:
+            return self.nb_memo[state]
+        if not self.use_xor:
+            return _grundy_kernel(state, self.nb_adj, self.nb_closed,
+                                  self.nb_memo)
+        g = 0
+        for comp in self._find_components(state):
+            key = self._canon(comp)
+            v = self.comp_memo.get(key)
+            if v is None:
+                v = _grundy_kernel(comp, self.nb_adj, self.nb_closed,
+                                   self.nb_memo)
+                self.comp_memo[key] = v
+            else:
+                self.nb_memo[comp] = v
+            g ^= v
+        self.nb_memo[state] = g
+        return g
+
     def grundy(self, state=None):
-        self.recursive_calls += 1
-        
+        """
+        grundy value of state, computed without recursion
+        every move removes at least one node, so the unsolved states reachable
+        from state are collected first and then solved by ascending node count
+        """
         if state is None:
-            state = frozenset(self.nodes)
-        if len(state) == 0:
-            return 0
+            state = self.full
+        if self.use_numba:
+            return self._grundy_numba(state)
         if state in self.memo:
             return self.memo[state]
-        
-        # XOR optimization: check for disconnected components
-        if self.use_xor:
-            comps = self._find_components(state)
-            if len(comps) > 1:
-                self.xor_hits += 1
-                xor_val = 0
-                for comp in comps:
-                    xor_val ^= self.grundy(comp)
-                self.memo[state] = xor_val
-                return xor_val
-        
-        # standard recursive logic
-        vals = set()
-        for ns in self._next_states(state):
-            vals.add(self.grundy(ns))
-        g = mex(vals)
-        self.memo[state] = g
-        return g
+
+        # pass 1: unsolved reachable states, bucketed by popcount
+        # todo[st] = (comps, key): comps if st splits, else shape key
+        # stack entries are (st, known connected). components of a split
+        # are connected by construction, so they skip _find_components
+        todo = {}
+        levels = {}
+        queued = set()
+        stack = [(state, False)]
+        while stack:
+            st, conn = stack.pop()
+            if st in self.memo or st in todo:
+                continue
+            self.recursive_calls += 1
+            comps = key = None
+            # XOR optimization: check for disconnected components
+            if self.use_xor:
+                comps = None if conn else self._find_components(st)
+                if comps is not None and len(comps) > 1:
+                    self.xor_hits += 1
+                else:
+                    comps = None
+                    # connected: reuse result of an earlier component of same shape
+                    key = self._canon(st)
+                    if key in self.comp_memo:
+                        self.memo[st] = self.comp_memo[key]
+                        continue
+            if comps is not None:
+                stack.extend((comp, True) for comp in comps)
+            elif key is None or key not in queued:
+                queued.add(key)
+                stack.extend((child, False) for child in self._next_states(st))
+            # else same shape already queued: that one is solved first, reuse it
+            todo[st] = (comps, key)
+            levels.setdefault(bin(st).count("1"), []).append(st)
+
+        # pass 2: children always have fewer nodes, so they are solved first
+        for c in sorted(levels):
+            for st in levels[c]:
+                comps, key = todo[st]
+                if comps is not None:
+                    g = 0
+                    for comp in comps:
+                        g ^= self.memo[comp]
+                elif key is not None and key in self.comp_memo:
+                    g = self.comp_memo[key]
+                else:
+                    # child grundy values kept as bits of seen
+                    seen = 0
+                    for child in self._next_states(st):
+                        seen |= 1 << self.memo[child]
+                    # mex = index of lowest zero bit of seen
+                    g = (~seen & (seen + 1)).bit_length() - 1
+                    if key is not None:
+                        self.comp_memo[key] = g
+                self.memo[st] = g
+        return self.memo[state]
+
+    def nodes_of(self, state):
+        """labels of the nodes in state (in self.nodes order)"""
+        return [nd for i, nd in enumerate(self.nodes) if state >> i & 1]
+
+    def has(self, state, node):
+        """True if node is still present in state"""
+        return node in self.idx and bool(state >> self.idx[node] & 1)
+
+    def move(self, state, node, verbose=True):
+        """
+        state after playing node (node and its neighbors leave), printing
+        the same messages as remove_node_and_neighbors. node must be present
+        """
+        i = self.idx[node]
+        if verbose:
+            # one write for all lines
+            out = ["removed " + str(node)]
+            for nd in self.nodes_of(state & self.adj[i] & ~(1 << i)):
+                out.append(" also removed " + str(nd))
+            sys.stdout.write("\n".join(out) + "\n")
+        return state & ~self.closed[i]
+
+    def save_memo(self, path):
+        """
+        pickle comp_memo to path. its keys are component shapes (see _canon),
+        not node ids, so the file can seed analyzers of other graphs. the
+        python solver stores every connected state it solves, the numba path
+        the connected components of the states passed to grundy()
+        """
+        with open(path, "wb") as f:
+            pickle.dump(self.comp_memo, f)
+
+    def load_memo(self, path):
+        """
+        merge shapes saved by save_memo into comp_memo (used by both the
+        python solver and the numba path, see _grundy_numba)
+        """
+        with open(path, "rb") as f:
+            self.comp_memo.update(pickle.load(f))
+
+    def _child_values(self, state):
+        """[(i, grundy after moving at node i)] for every node i in state"""
+        moves = []
+        s = state
+        while s:
+            i = (s & -s).bit_length() - 1
+            s &= s - 1
+            moves.append((i, state & ~self.closed[i]))
+        return [(i, self.grundy(c)) for i, c in moves]
 
     def winning_moves(self, state=None):
         if state is None:
-            state = frozenset(self.nodes)
-        if self.grundy(state) == 0:
-            return []
+            state = self.full
+        return [self.nodes[i] for i, g in self._child_values(state) if g == 0]
+
+    def grundy_and_winning(self, state=None):
+        """
+        (grundy, winning moves) of state from one pass over its moves:
+        the grundy is the mex of the child values, and the winning moves
+        are the children with value 0
+        """
+        if state is None:
+            state = self.full
+        seen = 0
         out = []
-        rem = set(state)
-        for node in state:
-            nb = set(self._nbrs(node, rem))
-            new = rem - {node} - nb
-            if self.grundy(frozenset(new)) == 0:
-                out.append(node)
-        return out
\ No newline at end of file
+        for i, g in self._child_values(state):
+            seen |= 1 << g
+            if g == 0:
+                out.append(self.nodes[i])
+        return (~seen & (seen + 1)).bit_length() - 1, out
+
+    def _p_lookup(self, state):
+        """
+        (is_p, key) for _is_p: is_p is True/False when already known (memo,
+        n_states, shape memo, or a split state solved by grundy()), else
+        None and key is the shape key to store the result under
+        """
+        if state in self.memo:
+            return self.memo[state] == 0, None
+        if state in self.n_states:
+            return False, None
+        key = None
+        if self.use_xor:
+            if len(self._find_components(state)) > 1:
+                # needs the XOR of its components, no cutoff possible
+                return self.grundy(state) == 0, None
+            key = self._canon(state)
+            if key in self.comp_memo:
+                self.memo[state] = self.comp_memo[key]
+                return self.memo[state] == 0, None
+        return None, key
+
+    def _p_children(self, state):
+        """child states, smallest first (biggest closed neighborhood)"""
+        cand = []
+        s = state
+        while s:
+            i = (s & -s).bit_length() - 1
+            s &= s - 1
+            cand.append((-bin(self.closed[i] & state).count("1"),
+                         state & ~self.closed[i]))
+        cand.sort()
+        return [c for _, c in cand]
+
+    def _is_p(self, state):
+        """
+        True if state is a P-position (grundy 0), with an early cutoff: a
+        connected state stops at its first P child, smallest children first,
+        and only remembers that it is an N-position (self.n_states)
+        iterative dfs, frames are [state, key, children, next index]
+        """
+        res, key = self._p_lookup(state)
+        if res is not None:
+            return res
+        stack = [[state, key, self._p_children(state), 0]]
+        res = None
+        while stack:
+            fr = stack[-1]
+            if res is not None:
+                # a child of fr was just decided
+                if res:
+                    # P child: fr is an N-position
+                    self.n_states.add(fr[0])
+                    stack.pop()
+                    res = False
+                    continue
+                res = None
+            st, key, kids, j = fr
+            if j == len(kids):
+                # no P child: grundy is exactly 0
+                self.memo[st] = 0
+                if key is not None:
+                    self.comp_memo[key] = 0
+                stack.pop()
+                res = True
+                continue
+            fr[3] = j + 1
+            res, ckey = self._p_lookup(kids[j])
+            if res is None:
+                stack.append([kids[j], ckey, self._p_children(kids[j]), 0])
+        return res
+
+    def any_winning_move(self, state=None):
+        """
+        first winning move found, or None in a P-position
+        tries nodes with the biggest closed neighborhood first: they leave
+        the smallest child state, which is cheapest to solve. without numba
+        the children are checked with _is_p, which can stop early instead of
+        solving each child's grundy
+        """
+        if state is None:
+            state = self.full
+        cand = []
+        s = state
+        while s:
+            i = (s & -s).bit_length() - 1
+            s &= s - 1
+            cand.append((-bin(self.closed[i] & state).count("1"), i))
+        cand.sort()
+        is_p = (lambda c: self.grundy(c) == 0) if self.use_numba else self._is_p
+        for _, i in cand:
+            if is_p(state & ~self.closed[i]):
+                return self.nodes[i]
+        return None
+
+
+def grundy_split(g, with_moves=False):
+    """
+    grundy of g as the XOR of its connected components, each solved by its
+    own SG (small analyzers, each can use the numba kernel on its own)
+    with_moves: also return the winning moves. a move in component c wins
+    when it leaves c with grundy total ^ grundy(c), so only c is searched
+    """
+    # subgraph views, not copies: SG only reads its graph
+    parts = [SG(g.subgraph(c)) for c in nx.connected_components(g)]
+    vals = [s.grundy() for s in parts]
+    total = reduce(xor, vals, 0)
+    if not with_moves:
+        return total
+    out = []
+    if total:
+        for s, gc in zip(parts, vals):
+            need = total ^ gc
+            for i, v in s._child_values(s.full):
+                if v == need:
+                    out.append(s.nodes[i])
+    return total, out
+
+def warm_up():
+    """
+    run the numba kernel once on a tiny graph. the kernel itself is loaded
+    from the on-disk cache (cache=True), but the typed dict code behind the
+    memo is compiled again in every process (~1s), so main() calls this in
+    a background thread while the menu is shown
+    """
+    if NUMBA_AVAILABLE:
+        SG(nx.path_graph(3)).grundy()
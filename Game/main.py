@@ -1,15 +1,37 @@
 
 import networkx as nx
+import matplotlib.pyplot as plt
 import random
+import sys
+import threading
 from game_helpers import (
     gen_graph,
     sample_graph,
     draw,
     draw_with_pos,
-    remove_node_and_neighbors,
-    SG
+    grundy_split,
+    MAX_ANALYZABLE,
+    Renderer,
+    SG,
+    warm_up
 )
 
+# built once: play() never changes g's nodes or edges (drawing g caches its
+# layout in g.graph, the per-turn views cache nothing). its analyzer is made
+# on the first sample game and kept, so replays start from solved states.
+# random games get a fresh analyzer each, freed with its memo when the game
+# ends
+_SAMPLE = sample_graph()
+_sample_sg = None
+
+def _parse_node(s):
+    """
+    int if s is a whole number (optional + or - sign, decimal digits), else
+    s as is. checked without try/except
+    """
+    digits = s[1:] if s[:1] in ("-", "+") else s
+    return int(s) if digits.isdecimal() else s
+
 def menu():
     print("NODEPOCALYPSE")
     print("1. play random graph (Human vs Human)")
@@ -19,87 +41,106 @@ def menu():
     print("5. analyze graph (enter edges)")
     print("6. exit")
 
-def play(g, name="game", vs_computer=False):
-    """play loop on graph g"""
-    gg = g.copy()
-    print("starting", name, "nodes:", len(gg.nodes()))
-    sgan = SG(gg)
-    g0 = sgan.grundy()
+def play(g, name="game", vs_computer=False, renderer=None, sgan=None):
+    """
+    play loop on graph g (renderer: optional Renderer so drawing doesn't
+    block the loop, sgan: SG(g) to reuse, a new one is made if None)
+    """
+    if renderer is not None:
+        show = renderer.draw_with_pos
+    else:
+        # one figure for the whole game, redrawn in place every turn
+        plt.ion()
+        ax = plt.subplots(figsize=(9,7))[1]
+
+        def show(gr, title):
+            nonlocal ax
+            ax = draw_with_pos(gr, title, ax=ax)
+    print("starting", name, "nodes:", len(g.nodes()))
+    # one analyzer for the whole game. the position is a bitmask of g's
+    # nodes (see SG), so a move is one AND-NOT, g is never copied or changed,
+    # and each turn reuses what earlier turns already solved
+    if sgan is None:
+        sgan = SG(g)
+    state = sgan.full
+    g0, wins = sgan.grundy_and_winning()
     print("initial grundy:", g0)
     if g0 > 0:
         print("initial: N-position (first can win)")
-        print("winning moves:", sgan.winning_moves())
+        print("winning moves:", wins)
     else:
         print("initial: P-position (first will lose if opponent plays well)")
-    draw_with_pos(gg, "initial "+name)
+    show(g, "initial "+name)
 
     players = ["p1", "p2"]
     if vs_computer:
         print("Computer will play as p2")
 
     turn = 0
-    while len(gg.nodes()) > 0:
+    while state:
         cur = players[turn % 2]
-        print("\nturn:", cur)
-        print("nodes:", sorted(gg.nodes()))
-        
-        s = SG(gg)
-        gnow = s.grundy()
-        # print("grundy now:", gnow) 
+        # alive nodes once per turn, reused by the prompt and the computer
+        alive = sgan.nodes_of(state)
+        # turn header collected and written at once
+        out = ["", "turn: " + cur, "nodes: " + str(alive)]
 
         # --- Computer Logic ---
         if vs_computer and cur == "p2":
-            print("Computer is thinking...")
-            wins = s.winning_moves()
+            out.append("Computer is thinking...")
+            sys.stdout.write("\n".join(out) + "\n")
+            win = sgan.any_winning_move(state)
             
-            if len(wins) > 0:
+            if win is not None:
                 # Optimal play: Pick the first winning move found
-                node = wins[0]
+                node = win
                 print(f"Computer chooses winning move: {node}")
             else:
                 # Losing position: Pick a random valid move
-                node = random.choice(list(gg.nodes()))
+                node = random.choice(alive)
                 print(f"Computer (in losing position) chooses: {node}")
             
-            remove_node_and_neighbors(gg, node)
-            if len(gg.nodes()) == 0:
+            state = sgan.move(state, node)
+            if not state:
                 print(cur, "wins")
                 break
-            draw_with_pos(gg, "after "+str(node))
+            # networkx view only for drawing, not for analysis
+            show(g.subgraph(sgan.nodes_of(state)), "after "+str(node))
             turn += 1
             continue
         # ----------------------
 
-        if gnow > 0:
-            print("winning moves:", s.winning_moves())
+        # one winning move tells N from P, the full list only on request
+        hint = sgan.any_winning_move(state)
+        if hint is not None:
+            out.append(f"winning move: {hint} (? for all)")
         else:
-            print("no winning moves")
+            out.append("no winning moves")
+        sys.stdout.write("\n".join(out) + "\n")
 
         while True:
             choice = input("enter node to remove (or q to quit): ").strip()
             if choice.lower() == 'q':
                 print("aborted")
                 return
-            # try to parse int, else leave as string
-            try:
-                node = int(choice)
-            except:
-                node = choice
-            if node not in gg.nodes():
+            if choice == "?":
+                print("winning moves:", sgan.winning_moves(state))
+                continue
+            node = _parse_node(choice)
+            if not sgan.has(state, node):
                 print("invalid node")
                 continue
             break
 
-        remove_node_and_neighbors(gg, node)
-        if len(gg.nodes()) == 0:
+        state = sgan.move(state, node)
+        if not state:
             print(cur, "wins")
             break
-        draw_with_pos(gg, "after "+str(node))
+        show(g.subgraph(sgan.nodes_of(state)), "after "+str(node))
         turn += 1
 
     print("game over")
 
-def play_rand(vs_computer=False):
+def play_rand(vs_computer=False, renderer=None):
     mn = input("min nodes (default 5): ").strip()
     mx = input("max nodes (default 10): ").strip()
     md = input("max degree (default 3): ").strip()
@@ -109,16 +150,23 @@ def play_rand(vs_computer=False):
         md = int(md) if md else 3
     except:
         mn, mx, md = 5,10,3
+    if mx > MAX_ANALYZABLE:
+        # bigger graphs would stall every turn's analysis
+        print("max nodes capped at", MAX_ANALYZABLE)
+        mx = MAX_ANALYZABLE
+        mn = min(mn, mx)
     g = gen_graph(mn, mx, md)
     mode = "PvC" if vs_computer else "PvP"
-    play(g, f"random {mode}", vs_computer)
+    play(g, f"random {mode}", vs_computer, renderer)
 
-def play_sample(vs_computer=False):
-    g = sample_graph()
+def play_sample(vs_computer=False, renderer=None):
+    global _sample_sg
+    if _sample_sg is None:
+        _sample_sg = SG(_SAMPLE)
     mode = "PvC" if vs_computer else "PvP"
-    play(g, f"sample {mode}", vs_computer)
+    play(_SAMPLE, f"sample {mode}", vs_computer, renderer, _sample_sg)
 
-def analyze():
+def analyze(renderer=None):
     print("build graph by entering edges like 'a b' or '1 2'. empty line to finish")
     g = nx.Graph()
     while True:
@@ -129,44 +177,46 @@ def analyze():
         if len(parts) != 2:
             print("bad input")
             continue
-        a, b = parts[0], parts[1]
-        try:
-            a = int(a)
-            b = int(b)
-        except:
-            pass
+        a, b = _parse_node(parts[0]), _parse_node(parts[1])
         g.add_edge(a, b)
         print("added", a, b)
     print("nodes:", sorted(g.nodes()))
     print("edges:", list(g.edges()))
-    s = SG(g)
-    gg = s.grundy()
+    gg, wins = grundy_split(g, with_moves=True)
     print("grundy:", gg)
     if gg > 0:
-        print("N-position, winning moves:", s.winning_moves())
+        print("N-position, winning moves:", wins)
     else:
         print("P-position")
-    draw_with_pos(g, "analyzed graph")
+    show = renderer.draw_with_pos if renderer is not None else draw_with_pos
+    show(g, "analyzed graph")
 
 def main():
-    while True:
-        menu()
-        c = input("choice: ").strip()
-        if c == "1":
-            play_rand(vs_computer=False)
-        elif c == "2":
-            play_rand(vs_computer=True)
-        elif c == "3":
-            play_sample(vs_computer=False)
-        elif c == "4":
-            play_sample(vs_computer=True)
-        elif c == "5":
-            analyze()
-        elif c == "6":
-            print("bye")
-            break
-        else:
-            print("bad choice")
+    # drawing runs in its own process, the game goes on while it renders
+    rend = Renderer()
+    # numba setup happens while the menu waits for input
+    threading.Thread(target=warm_up, daemon=True).start()
+    try:
+        while True:
+            menu()
+            c = input("choice: ").strip()
+            if c == "1":
+                play_rand(vs_computer=False, renderer=rend)
+            elif c == "2":
+                play_rand(vs_computer=True, renderer=rend)
+            elif c == "3":
+                play_sample(vs_computer=False, renderer=rend)
+            elif c == "4":
+                play_sample(vs_computer=True, renderer=rend)
+            elif c == "5":
+                analyze(renderer=rend)
+            elif c == "6":
+                print("bye")
+                break
+            else:
+                print("bad choice")
+    finally:
+        rend.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file